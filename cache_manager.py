@@ -6,22 +6,115 @@ Manage cached league data for the FPL Player Combination Analysis Tool.
 """
 
 import os
-import json
-import shutil
+import math
+import functools
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from player_combination_analysis import FPLCombinationAnalyzer
+from player_combination_analysis import FPLCombinationAnalyzer, CACHE_INDEX_FILE
+
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+_INFO_SUFFIX = '_info.json'
+_CACHE_SUFFIXES = ('.npz', '.pkl', _INFO_SUFFIX)
+_SIZE_NAMES = ["B", "KB", "MB", "GB"]
 
 
 def format_size(size_bytes):
     """Format file size in human readable format."""
     if size_bytes == 0:
         return "0B"
-    size_names = ["B", "KB", "MB", "GB"]
-    i = 0
-    while size_bytes >= 1024 and i < len(size_names) - 1:
-        size_bytes /= 1024
-        i += 1
-    return f"{size_bytes:.1f}{size_names[i]}"
+    i = min(int(math.log2(size_bytes)) // 10, len(_SIZE_NAMES) - 1)
+    return f"{size_bytes / (1 << (i * 10)):.1f}{_SIZE_NAMES[i]}"
+
+
+def _cache_state(analyzer):
+    """Return a key that changes whenever the cache contents change.
+
+    The directory mtime covers files being added or removed. Re-caching a
+    league rewrites its files in place, which leaves the directory mtime
+    alone but always rewrites the cache index, so its mtime is included.
+    """
+    try:
+        index_mtime = os.stat(os.path.join(
+            analyzer.cache_dir, CACHE_INDEX_FILE)).st_mtime_ns
+    except OSError:
+        index_mtime = 0
+    return os.stat(analyzer.cache_dir).st_mtime_ns, index_mtime
+
+
+def _load_all_cache_infos(analyzer):
+    """Return (info_path, cache_info, data_size, info_size) for every cached league.
+
+    Results are memoized on the cache state, so adding, deleting or
+    re-caching leagues invalidates them automatically.
+    """
+    return _scan_cache_infos(analyzer, _cache_state(analyzer))[0]
+
+
+def _cache_dir_size(analyzer):
+    """Return the combined size of every file in the cache directory."""
+    return _scan_cache_infos(analyzer, _cache_state(analyzer))[1]
+
+
+def _data_filenames(analyzer, league_id, gameweek):
+    """Return the (data, legacy data) file names for a cached league."""
+    return (os.path.basename(analyzer.get_cache_filename(league_id, gameweek)),
+            os.path.basename(analyzer.get_legacy_cache_filename(league_id, gameweek)))
+
+
+def _read_cache_info(path):
+    """Read and parse a single cache info file, or None if it is unreadable."""
+    try:
+        with open(path, 'rb') as f:
+            return _json.loads(f.read())
+    except Exception:
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def _scan_cache_infos(analyzer, cache_state):
+    """Scan the cache directory once, parsing every info file and totalling sizes."""
+    sizes = {}
+    info_entries = []
+    with os.scandir(analyzer.cache_dir) as it:
+        for entry in it:
+            sizes[entry.name] = entry.stat().st_size
+            if entry.name.endswith(_INFO_SUFFIX):
+                info_entries.append(entry)
+
+    total_size = sum(sizes.values())
+    if not info_entries:
+        return (), total_size
+
+    # Overlap the file reads; the work is I/O bound so threads scale well
+    with ThreadPoolExecutor(max_workers=min(16, len(info_entries))) as executor:
+        infos = list(executor.map(
+            _read_cache_info, [entry.path for entry in info_entries]))
+
+    caches = []
+    for entry, cache_info in zip(info_entries, infos):
+        try:
+            data_file, legacy_file = _data_filenames(
+                analyzer, cache_info['league_id'], cache_info['gameweek'])
+        except Exception:
+            continue
+        data_size = sizes.get(data_file) or sizes.get(legacy_file, 0)
+        caches.append((entry.path, cache_info, data_size, sizes[entry.name]))
+    return tuple(caches), total_size
+
+
+def _cached_at_ts(cache_info):
+    """Return the cache's epoch timestamp, deriving it for older info files."""
+    cached_at_ts = cache_info.get('cached_at_ts')
+    if cached_at_ts is None:
+        cached_at_ts = datetime.fromisoformat(
+            cache_info['cached_at']).timestamp()
+        cache_info['cached_at_ts'] = cached_at_ts
+    return cached_at_ts
 
 
 def manage_cache():
@@ -29,11 +122,20 @@ def manage_cache():
     print("🗄️  FPL Cache Management Tool")
     print("="*50)
 
-    analyzer = FPLCombinationAnalyzer()
+    # The analyzer is only built once an action actually needs it
+    get_analyzer = functools.lru_cache(maxsize=1)(FPLCombinationAnalyzer)
 
-    if not os.path.exists(analyzer.cache_dir):
-        print("📂 No cache directory found")
-        return
+    # Created once per session; the handlers below assume the directory
+    # exists since clearing the cache no longer removes it
+    os.makedirs(FPLCombinationAnalyzer.cache_dir, exist_ok=True)
+
+    actions = {
+        '1': list_caches,
+        '2': view_cache_details,
+        '3': delete_specific_cache,
+        '4': clear_all_cache,
+        '5': cache_statistics
+    }
 
     while True:
         print("\n📋 Cache Management Options:")
@@ -46,16 +148,8 @@ def manage_cache():
 
         choice = input("\nSelect option (1-6): ").strip()
 
-        if choice == '1':
-            list_caches(analyzer)
-        elif choice == '2':
-            view_cache_details(analyzer)
-        elif choice == '3':
-            delete_specific_cache(analyzer)
-        elif choice == '4':
-            clear_all_cache(analyzer)
-        elif choice == '5':
-            cache_statistics(analyzer)
+        if choice in actions:
+            actions[choice](get_analyzer())
         elif choice == '6':
             print("👋 Goodbye!")
             break
@@ -76,55 +170,38 @@ def list_caches(analyzer):
 
 def view_cache_details(analyzer):
     """View detailed information about a specific cache."""
-    cache_files = []
-    for filename in os.listdir(analyzer.cache_dir):
-        if filename.endswith('_info.json'):
-            try:
-                info_file = os.path.join(analyzer.cache_dir, filename)
-                with open(info_file, 'r') as f:
-                    cache_info = json.load(f)
-                cache_files.append(cache_info)
-            except Exception:
-                continue
+    caches = _load_all_cache_infos(analyzer)
+    cache_files = [cache_info for _, cache_info, _, _ in caches]
 
     if not cache_files:
         print("📂 No cached leagues found")
         return
 
-    print("\n📋 Select a cache to view details:")
-    for i, cache in enumerate(cache_files, 1):
-        print(
-            f"{i}. League {cache['league_id']} (GW {cache['gameweek']}) - {cache['manager_count']} managers")
+    print("\n📋 Select a cache to view details:\n" + "\n".join(
+        f"{i}. League {cache['league_id']} (GW {cache['gameweek']}) - {cache['manager_count']} managers"
+        for i, cache in enumerate(cache_files, 1)))
 
     try:
         choice = int(input(f"\nSelect cache (1-{len(cache_files)}): "))
         if 1 <= choice <= len(cache_files):
-            cache = cache_files[choice - 1]
-
-            # Get file sizes
-            cache_file = analyzer.get_cache_filename(
-                cache['league_id'], cache['gameweek'])
-            info_file = analyzer.get_cache_info_filename(
-                cache['league_id'], cache['gameweek'])
-
-            cache_size = os.path.getsize(
-                cache_file) if os.path.exists(cache_file) else 0
-            info_size = os.path.getsize(
-                info_file) if os.path.exists(info_file) else 0
+            _, cache, cache_size, info_size = caches[choice - 1]
             total_size = cache_size + info_size
-
-            print(f"\n📄 Cache Details:")
-            print(f"League ID: {cache['league_id']}")
-            print(f"Gameweek: {cache['gameweek']}")
-            print(f"Managers: {cache['manager_count']}")
-            print(
-                f"Total managers in league: {cache['total_managers_in_league']}")
-            print(
-                f"Coverage: {cache['manager_count']/cache['total_managers_in_league']*100:.1f}%")
-            print(f"Cached at: {cache['cached_at']}")
-            print(f"Data file size: {format_size(cache_size)}")
-            print(f"Info file size: {format_size(info_size)}")
-            print(f"Total size: {format_size(total_size)}")
+            manager_count = cache['manager_count']
+            total_managers = cache['total_managers_in_league']
+            coverage = manager_count / total_managers * 100 if total_managers else 0.0
+
+            print("\n".join([
+                f"\n📄 Cache Details:",
+                f"League ID: {cache['league_id']}",
+                f"Gameweek: {cache['gameweek']}",
+                f"Managers: {manager_count}",
+                f"Total managers in league: {total_managers}",
+                f"Coverage: {coverage:.1f}%",
+                f"Cached at: {cache['cached_at']}",
+                f"Data file size: {format_size(cache_size)}",
+                f"Info file size: {format_size(info_size)}",
+                f"Total size: {format_size(total_size)}"
+            ]))
         else:
             print("❌ Invalid selection")
     except ValueError:
@@ -133,27 +210,20 @@ def view_cache_details(analyzer):
 
 def delete_specific_cache(analyzer):
     """Delete a specific cache."""
-    cache_files = []
-    for filename in os.listdir(analyzer.cache_dir):
-        if filename.endswith('_info.json'):
-            try:
-                info_file = os.path.join(analyzer.cache_dir, filename)
-                with open(info_file, 'r') as f:
-                    cache_info = json.load(f)
-                cache_files.append(cache_info)
-            except Exception:
-                continue
+    cache_files = [cache_info for _, cache_info, _, _ in
+                   _load_all_cache_infos(analyzer)]
 
     if not cache_files:
         print("📂 No cached leagues found")
         return
 
-    print("\n🗑️  Select a cache to delete:")
+    lines = ["\n🗑️  Select a cache to delete:"]
+    now = datetime.now()
     for i, cache in enumerate(cache_files, 1):
-        cached_time = datetime.fromisoformat(cache['cached_at'])
-        time_ago = datetime.now() - cached_time
-        print(
+        time_ago = now - datetime.fromisoformat(cache['cached_at'])
+        lines.append(
             f"{i}. League {cache['league_id']} (GW {cache['gameweek']}) - {time_ago.days}d {time_ago.seconds//3600}h ago")
+    print("\n".join(lines))
 
     try:
         choice = int(
@@ -164,16 +234,9 @@ def delete_specific_cache(analyzer):
             confirm = input(
                 f"Delete League {cache['league_id']} GW {cache['gameweek']} cache? (y/n): ").lower()
             if confirm == 'y':
-                cache_file = analyzer.get_cache_filename(
-                    cache['league_id'], cache['gameweek'])
-                info_file = analyzer.get_cache_info_filename(
-                    cache['league_id'], cache['gameweek'])
-
                 try:
-                    if os.path.exists(cache_file):
-                        os.remove(cache_file)
-                    if os.path.exists(info_file):
-                        os.remove(info_file)
+                    analyzer.delete_cache(
+                        cache['league_id'], cache['gameweek'])
                     print(
                         f"✅ Deleted cache for League {cache['league_id']} GW {cache['gameweek']}")
                 except Exception as e:
@@ -187,24 +250,30 @@ def delete_specific_cache(analyzer):
 
 
 def clear_all_cache(analyzer):
-    """Clear all cached data."""
-    if not os.path.exists(analyzer.cache_dir):
-        print("📂 No cache directory found")
-        return
+    """Clear all cached league data.
 
-    file_count = len([f for f in os.listdir(analyzer.cache_dir)
-                     if f.endswith('.pkl') or f.endswith('.json')])
+    Only the league caches and their index are removed; the bootstrap
+    response and the checkpoints of unfinished fetches are kept.
+    """
+    with os.scandir(analyzer.cache_dir) as it:
+        cache_files = [entry.path for entry in it
+                       if entry.name.startswith('league_')
+                       and entry.name.endswith(_CACHE_SUFFIXES)]
 
-    if file_count == 0:
+    if not cache_files:
         print("📂 No cache files found")
         return
 
+    league_count = sum(1 for path in cache_files if path.endswith(_INFO_SUFFIX))
     confirm = input(
-        f"⚠️  Delete ALL {file_count//2} cached leagues? This cannot be undone! (y/n): ").lower()
+        f"⚠️  Delete ALL {league_count} cached leagues? This cannot be undone! (y/n): ").lower()
     if confirm == 'y':
         try:
-            shutil.rmtree(analyzer.cache_dir)
-            os.makedirs(analyzer.cache_dir)
+            # Unlink in place so the cache directory itself stays put
+            for path in cache_files:
+                os.unlink(path)
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(os.path.join(analyzer.cache_dir, CACHE_INDEX_FILE))
             print("✅ All cache data cleared")
         except Exception as e:
             print(f"❌ Error clearing cache: {e}")
@@ -214,45 +283,39 @@ def clear_all_cache(analyzer):
 
 def cache_statistics(analyzer):
     """Show cache statistics."""
-    if not os.path.exists(analyzer.cache_dir):
-        print("📂 No cache directory found")
-        return
-
-    cache_files = []
-    total_size = 0
-    total_managers = 0
-
-    for filename in os.listdir(analyzer.cache_dir):
-        filepath = os.path.join(analyzer.cache_dir, filename)
-        total_size += os.path.getsize(filepath)
-
-        if filename.endswith('_info.json'):
-            try:
-                with open(filepath, 'r') as f:
-                    cache_info = json.load(f)
-                cache_files.append(cache_info)
-                total_managers += cache_info['manager_count']
-            except Exception:
-                continue
-
-    print(f"\n📊 Cache Statistics:")
-    print(f"Number of cached leagues: {len(cache_files)}")
-    print(f"Total managers cached: {total_managers:,}")
-    print(f"Total cache size: {format_size(total_size)}")
-    print(
-        f"Average managers per league: {total_managers//len(cache_files) if cache_files else 0:,}")
+    cache_files = [cache_info for _, cache_info, _, _ in
+                   _load_all_cache_infos(analyzer)]
+    total_size = _cache_dir_size(analyzer)
+    total_managers = sum(cache_info.get('manager_count', 0)
+                         for cache_info in cache_files)
+
+    lines = [
+        f"\n📊 Cache Statistics:",
+        f"Number of cached leagues: {len(cache_files)}",
+        f"Total managers cached: {total_managers:,}",
+        f"Total cache size: {format_size(total_size)}",
+        f"Average managers per league: {total_managers//len(cache_files) if cache_files else 0:,}"
+    ]
 
     if cache_files:
-        oldest = min(cache_files, key=lambda x: x['cached_at'])
-        newest = max(cache_files, key=lambda x: x['cached_at'])
-
-        oldest_time = datetime.fromisoformat(oldest['cached_at'])
-        newest_time = datetime.fromisoformat(newest['cached_at'])
-
-        print(f"Oldest cache: {(datetime.now() - oldest_time).days} days ago")
-        print(
+        oldest_ts = newest_ts = _cached_at_ts(cache_files[0])
+        for cache in cache_files:
+            cached_at_ts = _cached_at_ts(cache)
+            if cached_at_ts < oldest_ts:
+                oldest_ts = cached_at_ts
+            elif cached_at_ts > newest_ts:
+                newest_ts = cached_at_ts
+
+        oldest_time = datetime.fromtimestamp(oldest_ts)
+        newest_time = datetime.fromtimestamp(newest_ts)
+
+        lines.append(
+            f"Oldest cache: {(datetime.now() - oldest_time).days} days ago")
+        lines.append(
             f"Newest cache: {(datetime.now() - newest_time).seconds//3600} hours ago")
 
+    print("\n".join(lines))
+
 
 if __name__ == "__main__":
     manage_cache()
@@ -17,62 +17,340 @@ Features:
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+import numpy as np
 import pandas as pd
 import time
-import gc
 import json
 import pickle
-from datetime import datetime, timedelta
+import struct
+import copy
+import functools
+import contextlib
+from datetime import datetime, timedelta, timezone
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Set, Tuple, Optional
 import sys
 import os
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Keep-alive connections held per host; sized above the largest speed
+# mode's worker count so no thread has to open a fresh TLS connection
+HTTP_POOL_SIZE = 32
+
 # Create a session for reusing connections
 session = requests.Session()
 session.headers.update({'User-Agent': 'FPL League Analysis Tool'})
+session.mount('https://', HTTPAdapter(pool_maxsize=HTTP_POOL_SIZE))
+
+# Number of players in an FPL squad
+SQUAD_SIZE = 15
+
+# Bootstrap player fields the analysis and web app read
+PLAYER_COLUMNS = ['id', 'first_name', 'second_name',
+                  'web_name', 'team', 'element_type']
+
+# Last bootstrap response and its validators, kept in the cache directory
+BOOTSTRAP_CACHE_FILE = 'bootstrap.bin'
+
+# How long a cached bootstrap response is used without revalidating it, so
+# repeated short runs (scripts, restarts) don't hit the API at all
+BOOTSTRAP_FRESH_SECONDS = 300
+
+# Info records of every cached league, keyed by info filename together
+# with that file's mtime, so listing caches reads one file instead of
+# every *_info.json
+CACHE_INDEX_FILE = 'index.json'
+
+# Checkpoint header: format magic, creation time (epoch seconds)
+CHECKPOINT_HEADER = struct.Struct('<4sd')
+CHECKPOINT_MAGIC = b'FPW1'
+
+# Checkpoint record: manager ID, 15 element IDs (0-padded), GW points
+CHECKPOINT_RECORD = struct.Struct('<I15Hh')
+
+# Most league standings pages fetched concurrently, and the pause in
+# seconds between each window of pages
+LEAGUE_PAGE_WORKERS = 8
+LEAGUE_PAGE_DELAY = 0.5
+
+# Standings fields kept when a league is written to the cache
+CACHED_STANDINGS_FIELDS = ('entry', 'player_name', 'entry_name', 'total')
+
+# Upper bound on a picks payload; real ones are a few KB, so anything
+# bigger is an error page and is not worth downloading
+MAX_SQUAD_PAYLOAD = 20000
+
+
+@functools.lru_cache(maxsize=64)
+def _cache_path(cache_dir: str, league_id: int, gameweek: int, suffix: str) -> str:
+    """Build the path of a league/gameweek cache file."""
+    return os.path.join(cache_dir, f"league_{league_id}_gw_{gameweek}{suffix}")
 
 
 class FPLCombinationAnalyzer:
+    cache_dir = "fpl_cache"
+
     def __init__(self):
         self.bootstrap_data = None
         self.players_df = None
+        self._name_index = {}
+        self._name_lc = None
+        self.web_name_index = {}
+        self.team_name_by_id = {}
+        self.position_name_by_id = {}
         self.league_data = None
         self.manager_squads = {}
         self.current_league_id = None
-        self.cache_dir = "fpl_cache"
 
         # Create cache directory if it doesn't exist
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
 
+    @functools.cached_property
+    def current_gameweek(self) -> int:
+        """ID of the current gameweek from bootstrap data (1 if unknown).
+
+        Cached; initialize_data clears it whenever new bootstrap data loads.
+        """
+        if not self.bootstrap_data:
+            return 1
+        events = self.bootstrap_data.get('events', [])
+        return next((gw['id'] for gw in events if gw['is_current']), 1)
+
+    @property
+    def manager_squads(self) -> Dict[int, Dict]:
+        """Slim squads keyed by manager ID.
+
+        The search matrix is rebuilt whenever a new dict is assigned, so
+        replace the dict rather than mutating it in place.
+        """
+        return self._manager_squads
+
+    @manager_squads.setter
+    def manager_squads(self, manager_squads: Dict[int, Dict]):
+        self._manager_squads = manager_squads
+        self._build_squad_matrix()
+
+    def for_new_league(self) -> 'FPLCombinationAnalyzer':
+        """Return an analyzer with no league loaded that shares this one's
+        bootstrap and player data, for holding several leagues at once."""
+        league_analyzer = copy.copy(self)
+        league_analyzer.league_data = None
+        league_analyzer.manager_squads = {}
+        league_analyzer.current_league_id = None
+        return league_analyzer
+
     def get_cache_filename(self, league_id: int, gameweek: int = None) -> str:
         """Generate cache filename for a specific league and gameweek."""
         if gameweek is None:
-            if self.bootstrap_data:
-                events = self.bootstrap_data.get('events', [])
-                gameweek = next((gw['id']
-                                for gw in events if gw['is_current']), 1)
-            else:
-                gameweek = 1
-        return os.path.join(self.cache_dir, f"league_{league_id}_gw_{gameweek}.pkl")
+            gameweek = self.current_gameweek
+        return _cache_path(self.cache_dir, league_id, gameweek, '.npz')
+
+    def get_legacy_cache_filename(self, league_id: int, gameweek: int = None) -> str:
+        """Generate the pickle cache filename used by older versions."""
+        if gameweek is None:
+            gameweek = self.current_gameweek
+        return _cache_path(self.cache_dir, league_id, gameweek, '.pkl')
 
     def get_cache_info_filename(self, league_id: int, gameweek: int = None) -> str:
         """Generate cache info filename for metadata."""
         if gameweek is None:
-            if self.bootstrap_data:
-                events = self.bootstrap_data.get('events', [])
-                gameweek = next((gw['id']
-                                for gw in events if gw['is_current']), 1)
-            else:
-                gameweek = 1
-        return os.path.join(self.cache_dir, f"league_{league_id}_gw_{gameweek}_info.json")
+            gameweek = self.current_gameweek
+        return _cache_path(self.cache_dir, league_id, gameweek, '_info.json')
+
+    def get_checkpoint_filename(self, league_id: int, gameweek: int = None) -> str:
+        """Generate the append-only checkpoint filename used while fetching squads."""
+        if gameweek is None:
+            gameweek = self.current_gameweek
+        return _cache_path(self.cache_dir, league_id, gameweek, '.wal')
+
+    def get_cache_ttl(self) -> timedelta:
+        """How long a squad cache stays fresh, based on the current gameweek's state.
+
+        Picks are locked once a gameweek's deadline passes, so a cache only
+        goes stale quickly while the gameweek is live and points still move.
+        """
+        if not self.bootstrap_data:
+            return timedelta(hours=1)
+
+        events = self.bootstrap_data.get('events', [])
+        current_event = next((gw for gw in events if gw['is_current']), None)
+        if current_event is None:
+            return timedelta(hours=24)
+        if current_event.get('finished'):
+            return timedelta(days=7)
+
+        try:
+            deadline = datetime.fromisoformat(
+                current_event['deadline_time'].replace('Z', '+00:00'))
+        except (KeyError, TypeError, ValueError):
+            return timedelta(hours=24)
+
+        until_deadline = deadline - datetime.now(timezone.utc)
+        if until_deadline > timedelta(hours=1):
+            return timedelta(days=7)
+        if until_deadline <= timedelta(0):
+            # Live gameweek: auto-subs and points change by the minute
+            return timedelta(minutes=5)
+        return timedelta(hours=24)
 
     def cache_exists(self, league_id: int, gameweek: int = None) -> bool:
         """Check if cache files exist for the given league and gameweek."""
         cache_file = self.get_cache_filename(league_id, gameweek)
+        legacy_file = self.get_legacy_cache_filename(league_id, gameweek)
         info_file = self.get_cache_info_filename(league_id, gameweek)
-        return os.path.exists(cache_file) and os.path.exists(info_file)
+        return (os.path.exists(cache_file) or os.path.exists(legacy_file)) and os.path.exists(info_file)
+
+    def _write_squads_file(self, cache_file: str):
+        """Write manager squads, their owner index and league data to a .npz archive."""
+        manager_ids_arr, squad_mat = self._get_squad_matrix()
+        owner_rows, owner_offsets = self._get_owner_index()
+        points = np.array([
+            (self.manager_squads[manager_id].get('entry_history') or {}).get('points', 0)
+            for manager_id in manager_ids_arr.tolist()
+        ], dtype=np.int16)
+        # League standings are plain JSON, stored as a byte array so the
+        # archive never needs pickle to load
+        league_data = self.league_data
+        if league_data and 'standings' in league_data:
+            league_data = dict(league_data)
+            league_data['standings'] = {
+                'results': [
+                    {field: manager[field]
+                        for field in CACHED_STANDINGS_FIELDS if field in manager}
+                    for manager in league_data['standings'].get('results', [])
+                ]
+            }
+        league_json = json.dumps(league_data, separators=(',', ':')).encode()
+
+        # Element IDs and standings JSON are highly repetitive, so deflate
+        # shrinks the archive several times over; np.load reads both forms
+        with open(cache_file, 'wb') as f:
+            np.savez_compressed(f, manager_ids=manager_ids_arr, squads=squad_mat, points=points,
+                                owner_rows=owner_rows, owner_offsets=owner_offsets,
+                                league_data=np.frombuffer(league_json, dtype=np.uint8))
+
+    def _read_squads_file(self, cache_file: str):
+        """Load manager squads and league data from a .npz archive."""
+        # Plain arrays only; refusing pickled objects keeps loading a cache
+        # file from running code
+        with np.load(cache_file, allow_pickle=False) as data:
+            manager_ids_arr = data['manager_ids']
+            squad_mat = data['squads']
+            points = data['points']
+            self.league_data = json.loads(data['league_data'].tobytes())
+            # Archives written before the owner index was stored rebuild
+            # it on first search instead
+            if 'owner_rows' in data.files:
+                owner_rows = data['owner_rows']
+                owner_offsets = data['owner_offsets']
+            else:
+                owner_rows = owner_offsets = None
+
+        # The archive already holds the search matrix, so the squads are
+        # stored without going through the rebuilding setter
+        self._manager_squads = {
+            manager_id: self._squad_from_elements(row, gw_points)
+            for manager_id, row, gw_points in zip(manager_ids_arr.tolist(), squad_mat.tolist(), points.tolist())
+        }
+        self._manager_ids_arr = manager_ids_arr
+        self._squad_mat = squad_mat
+        self._owner_rows = owner_rows
+        self._owner_offsets = owner_offsets
+
+    @staticmethod
+    def _squad_from_elements(elements: List[int], gw_points: int) -> Dict:
+        """Rebuild a slim squad dict from 0-padded element IDs and GW points."""
+        return {
+            'picks': [{'element': element} for element in elements if element],
+            'entry_history': {'points': gw_points}
+        }
+
+    def _pack_checkpoint_record(self, manager_id: int, squad: Dict) -> bytes:
+        """Pack one fetched squad into a fixed-size checkpoint record."""
+        elements = [pick['element'] for pick in squad['picks']][:SQUAD_SIZE]
+        elements += [0] * (SQUAD_SIZE - len(elements))
+        gw_points = (squad.get('entry_history') or {}).get('points', 0)
+        return CHECKPOINT_RECORD.pack(manager_id, *elements, gw_points)
+
+    def _open_checkpoint(self, checkpoint_file: str):
+        """Open a checkpoint file for reading and appending, or return None
+        if another fetch of the same league is already writing it.
+
+        The file stays locked while open, so concurrent loads of a league
+        can't interleave records; the lock goes away with the process.
+        """
+        checkpoint = open(checkpoint_file, 'a+b')
+        if fcntl is not None:
+            try:
+                fcntl.flock(checkpoint.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                checkpoint.close()
+                return None
+        return checkpoint
+
+    def _read_checkpoint(self, checkpoint, manager_ids: Set[int]) -> Dict[int, Dict]:
+        """Replay squads for the given managers from an open checkpoint.
+
+        A checkpoint older than the cache TTL holds GW points that may have
+        moved since, so it is emptied and restarted like a new one.
+        """
+        checkpoint.seek(0)
+        data = checkpoint.read()
+
+        header = data[:CHECKPOINT_HEADER.size]
+        if len(header) == CHECKPOINT_HEADER.size:
+            magic, created_at = CHECKPOINT_HEADER.unpack(header)
+        else:
+            magic, created_at = None, 0.0
+        if (magic != CHECKPOINT_MAGIC or
+                time.time() - created_at > self.get_cache_ttl().total_seconds()):
+            checkpoint.truncate(0)
+            checkpoint.write(CHECKPOINT_HEADER.pack(CHECKPOINT_MAGIC, time.time()))
+            return {}
+
+        # Drop a torn trailing record left by an interrupted write, on disk
+        # too, so records appended from here on stay aligned
+        data = data[CHECKPOINT_HEADER.size:]
+        torn = len(data) % CHECKPOINT_RECORD.size
+        if torn:
+            data = data[:-torn]
+            checkpoint.truncate(CHECKPOINT_HEADER.size + len(data))
+        squads = {}
+        for manager_id, *elements, gw_points in CHECKPOINT_RECORD.iter_unpack(data):
+            if manager_id in manager_ids:
+                squads[manager_id] = self._squad_from_elements(
+                    elements, gw_points)
+        return squads
+
+    def _read_legacy_squads_file(self, legacy_file: str):
+        """Load a pickle cache written by older versions."""
+        with open(legacy_file, 'rb') as f:
+            cached_data = pickle.load(f)
+
+        # Handle both old format (just manager squads) and new format (dict with both)
+        if isinstance(cached_data, dict) and 'manager_squads' in cached_data:
+            manager_squads = cached_data['manager_squads']
+            self.league_data = cached_data.get('league_data')
+        else:
+            manager_squads = cached_data
+            self.league_data = None
+
+        self.manager_squads = {
+            manager_id: self._slim_squad(squad_data)
+            for manager_id, squad_data in manager_squads.items()
+            if squad_data and 'picks' in squad_data
+        }
 
     def save_manager_squads_cache(self, league_id: int, gameweek: int = None):
         """Save manager squads and league data to cache file."""
@@ -81,25 +359,28 @@ class FPLCombinationAnalyzer:
             info_file = self.get_cache_info_filename(league_id, gameweek)
 
             # Save the squads data along with league data
-            cache_data = {
-                'manager_squads': self.manager_squads,
-                'league_data': self.league_data
-            }
+            self._write_squads_file(cache_file)
 
-            with open(cache_file, 'wb') as f:
-                pickle.dump(cache_data, f)
+            # Everything in the fetch checkpoint is now in the cache file
+            try:
+                os.remove(self.get_checkpoint_filename(league_id, gameweek))
+            except FileNotFoundError:
+                pass
 
             # Save metadata
+            cached_at = datetime.now()
             cache_info = {
                 'league_id': league_id,
                 'gameweek': gameweek,
                 'manager_count': len(self.manager_squads),
-                'cached_at': datetime.now().isoformat(),
+                'cached_at': cached_at.isoformat(),
+                'cached_at_ts': cached_at.timestamp(),
                 'total_managers_in_league': len(self.league_data['standings']['results']) if self.league_data else 0
             }
 
             with open(info_file, 'w') as f:
-                json.dump(cache_info, f, indent=2)
+                json.dump(cache_info, f, separators=(',', ':'))
+            self._sync_cache_index()
 
             print(
                 f"💾 Cached {len(self.manager_squads)} manager squads and league data to {cache_file}")
@@ -113,19 +394,33 @@ class FPLCombinationAnalyzer:
         """Load manager squads and league data from cache file."""
         try:
             cache_file = self.get_cache_filename(league_id, gameweek)
+            legacy_file = self.get_legacy_cache_filename(league_id, gameweek)
             info_file = self.get_cache_info_filename(league_id, gameweek)
 
-            if not os.path.exists(cache_file) or not os.path.exists(info_file):
+            if not os.path.exists(info_file):
+                return False
+            if os.path.exists(cache_file):
+                is_legacy = False
+            elif os.path.exists(legacy_file):
+                is_legacy = True
+            else:
                 return False
 
             # Load metadata
             with open(info_file, 'r') as f:
                 cache_info = json.load(f)
 
-            # Check if cache is recent (within 1 hour for same gameweek)
+            # Check if cache is recent enough for the current gameweek state
             cached_time = datetime.fromisoformat(cache_info['cached_at'])
-            if datetime.now() - cached_time > timedelta(hours=1):
-                print(f"⚠️  Cache is older than 1 hour, might be stale")
+            cache_ttl = self.get_cache_ttl()
+            if datetime.now() - cached_time > cache_ttl:
+                if cache_ttl.days:
+                    ttl_text = f"{cache_ttl.days} days"
+                elif cache_ttl.seconds >= 3600:
+                    ttl_text = f"{cache_ttl.seconds // 3600} hours"
+                else:
+                    ttl_text = f"{cache_ttl.seconds // 60} minutes"
+                print(f"⚠️  Cache is older than {ttl_text}, might be stale")
                 if not skip_prompt:
                     use_cache = input(
                         "Use cached data anyway? (y/n, default: y): ").lower()
@@ -136,22 +431,22 @@ class FPLCombinationAnalyzer:
                     print("📱 Web app context: using cache anyway for performance")
 
             # Load the cached data
-            with open(cache_file, 'rb') as f:
-                cached_data = pickle.load(f)
-
-            # Handle both old format (just manager squads) and new format (dict with both)
-            if isinstance(cached_data, dict) and 'manager_squads' in cached_data:
-                # New format with both manager squads and league data
-                self.manager_squads = cached_data['manager_squads']
-                self.league_data = cached_data.get('league_data')
+            if is_legacy:
+                self._read_legacy_squads_file(legacy_file)
                 print(
-                    f"📂 Loaded {len(self.manager_squads)} cached manager squads and league data (NEW FORMAT)")
+                    f"📂 Loaded {len(self.manager_squads)} cached manager squads (legacy format)")
+
+                # Rewrite as .npz so the pickle is only ever read once
+                try:
+                    self._write_squads_file(cache_file)
+                    os.remove(legacy_file)
+                    print(f"🔄 Converted legacy cache to {cache_file}")
+                except Exception as e:
+                    print(f"⚠️  Could not convert legacy cache: {e}")
             else:
-                # Old format - just manager squads
-                self.manager_squads = cached_data
-                self.league_data = None
+                self._read_squads_file(cache_file)
                 print(
-                    f"📂 Loaded {len(self.manager_squads)} cached manager squads (legacy format)")
+                    f"📂 Loaded {len(self.manager_squads)} cached manager squads and league data")
 
             print(f"🕒 Cached at: {cache_info['cached_at']}")
             print(
@@ -163,22 +458,84 @@ class FPLCombinationAnalyzer:
             print(f"❌ Error loading cache: {e}")
             return False
 
+    def delete_cache(self, league_id: int, gameweek: int = None):
+        """Remove every file of a league/gameweek cache and its index entry."""
+        info_file = self.get_cache_info_filename(league_id, gameweek)
+        for path in (self.get_cache_filename(league_id, gameweek),
+                     info_file,
+                     self.get_legacy_cache_filename(league_id, gameweek),
+                     self.get_checkpoint_filename(league_id, gameweek)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._sync_cache_index()
+
+    def _sync_cache_index(self) -> Dict[str, Dict]:
+        """Return the cache index, reconciled with the info files on disk.
+
+        Entries are checked against one directory scan: info files that are
+        new or whose mtime changed are parsed, entries whose file is gone
+        are dropped, and the index is rewritten only if anything changed.
+        That also repairs updates lost to concurrent writers.
+        """
+        index_file = os.path.join(self.cache_dir, CACHE_INDEX_FILE)
+        try:
+            with open(index_file, 'rb') as f:
+                index = _json_loads(f.read())
+            if not isinstance(index, dict):
+                index = {}
+        except (OSError, ValueError):
+            index = {}
+
+        info_mtimes = {}
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith('_info.json'):
+                    try:
+                        info_mtimes[entry.name] = entry.stat().st_mtime_ns
+                    except OSError:
+                        continue
+
+        changed = False
+        for filename in list(index):
+            if filename not in info_mtimes:
+                del index[filename]
+                changed = True
+        for filename, mtime_ns in info_mtimes.items():
+            record = index.get(filename)
+            if isinstance(record, list) and len(record) == 2 and record[0] == mtime_ns:
+                continue
+            try:
+                with open(os.path.join(self.cache_dir, filename), 'r') as f:
+                    index[filename] = [mtime_ns, json.load(f)]
+            except Exception:
+                index.pop(filename, None)
+            changed = True
+
+        if changed:
+            self._write_cache_index(index)
+        return {filename: record[1] for filename, record in index.items()}
+
+    def _write_cache_index(self, index: Dict[str, list]):
+        """Atomically replace the cache index."""
+        index_file = os.path.join(self.cache_dir, CACHE_INDEX_FILE)
+        # Per-process temp name so concurrent writers never share one
+        tmp_file = f"{index_file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump(index, f, separators=(',', ':'))
+            os.replace(tmp_file, index_file)
+        except OSError as e:
+            print(f"⚠️  Could not write cache index: {e}")
+
     def list_available_caches(self):
         """List all available cache files."""
         if not os.path.exists(self.cache_dir):
             print("📂 No cache directory found")
             return []
 
-        cache_files = []
-        for filename in os.listdir(self.cache_dir):
-            if filename.endswith('_info.json'):
-                try:
-                    info_file = os.path.join(self.cache_dir, filename)
-                    with open(info_file, 'r') as f:
-                        cache_info = json.load(f)
-                    cache_files.append(cache_info)
-                except Exception:
-                    continue
+        cache_files = list(self._sync_cache_index().values())
 
         if cache_files:
             print(f"\n📂 Available cached leagues:")
@@ -195,13 +552,75 @@ class FPLCombinationAnalyzer:
 
         return cache_files
 
+    def _read_bootstrap_cache(self) -> Optional[Tuple[Dict, bytes]]:
+        """Return the (validators, body) of the last bootstrap response, if cached."""
+        try:
+            with open(os.path.join(self.cache_dir, BOOTSTRAP_CACHE_FILE), 'rb') as f:
+                header, body = f.read().split(b'\n', 1)
+            return json.loads(header), body
+        except (OSError, ValueError):
+            return None
+
+    def _write_bootstrap_cache(self, response):
+        """Store the bootstrap body with its ETag/Last-Modified validators."""
+        validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified')
+        }
+        if not validators['etag'] and not validators['last_modified']:
+            return
+
+        # First line holds the validators, the raw body follows
+        cache_file = os.path.join(self.cache_dir, BOOTSTRAP_CACHE_FILE)
+        try:
+            with open(cache_file + '.tmp', 'wb') as f:
+                f.write(json.dumps(validators).encode() + b'\n')
+                f.write(response.content)
+            os.replace(cache_file + '.tmp', cache_file)
+        except OSError as e:
+            print(f"⚠️  Could not cache bootstrap data: {e}")
+
     def get_bootstrap_data(self):
-        """Fetch FPL bootstrap data with players, teams, etc."""
+        """Fetch FPL bootstrap data with players, teams, etc.
+
+        A cached response younger than BOOTSTRAP_FRESH_SECONDS is used without
+        a request. Otherwise the request is conditional on it. Either way,
+        when the cache is still valid the already-loaded data is returned
+        as-is, or the cached body is parsed if this is a fresh process.
+        """
         try:
             url = "https://fantasy.premierleague.com/api/bootstrap-static/"
-            response = session.get(url, timeout=10)
+            cache_file = os.path.join(self.cache_dir, BOOTSTRAP_CACHE_FILE)
+            try:
+                fresh = time.time() - \
+                    os.path.getmtime(cache_file) < BOOTSTRAP_FRESH_SECONDS
+            except OSError:
+                fresh = False
+            if fresh and self.bootstrap_data:
+                return self.bootstrap_data
+
+            cached = self._read_bootstrap_cache()
+            if fresh and cached:
+                return _json_loads(cached[1])
+
+            headers = {}
+            if cached:
+                validators = cached[0]
+                if validators.get('etag'):
+                    headers['If-None-Match'] = validators['etag']
+                if validators.get('last_modified'):
+                    headers['If-Modified-Since'] = validators['last_modified']
+
+            response = session.get(url, timeout=10, headers=headers)
+            if response.status_code == 304 and cached:
+                # Revalidated: restart the freshness window
+                os.utime(cache_file)
+                if self.bootstrap_data:
+                    return self.bootstrap_data
+                return _json_loads(cached[1])
             if response.status_code == 200:
-                return response.json()
+                self._write_bootstrap_cache(response)
+                return _json_loads(response.content)
             else:
                 print(
                     f"❌ Error fetching bootstrap data: {response.status_code}")
@@ -210,44 +629,67 @@ class FPLCombinationAnalyzer:
             print(f"❌ Exception fetching bootstrap data: {e}")
             return None
 
+    def _get_league_page(self, league_id: int, page: int) -> Optional[Dict]:
+        """Fetch a single page of league standings, or None if it failed."""
+        url = f"https://fantasy.premierleague.com/api/leagues-classic/{league_id}/standings/?page_standings={page}"
+        try:
+            response = session.get(url, timeout=10)
+            if response.status_code != 200:
+                print(
+                    f"❌ Error fetching league data page {page}: {response.status_code}")
+                return None
+            return response.json().get('standings', {})
+        except Exception as e:
+            print(f"❌ Exception fetching league data page {page}: {e}")
+            return None
+
     def get_league_data(self, league_id: int):
         """Fetch league standings data with pagination support for large leagues."""
         try:
             all_managers = []
             page = 1
+            window = 1
             has_next = True
 
             print(f"🔄 Fetching league {league_id} data (with pagination)...")
 
-            while has_next:
-                url = f"https://fantasy.premierleague.com/api/leagues-classic/{league_id}/standings/?page_standings={page}"
-                response = session.get(url, timeout=10)
+            # The API only reports has_next, so pages are fetched in windows
+            # that double up to LEAGUE_PAGE_WORKERS: small leagues stop with
+            # few requests past their last page, large ones soon fetch
+            # several pages at once. Windows are paced to stay polite.
+            with ThreadPoolExecutor(max_workers=LEAGUE_PAGE_WORKERS) as executor:
+                while has_next:
+                    pages = range(page, page + window)
+                    pages_standings = executor.map(
+                        lambda p: self._get_league_page(league_id, p), pages)
+
+                    for page, standings in zip(pages, pages_standings):
+                        if standings is None:
+                            if page == 1:  # If first page fails, return None
+                                return None
+                            has_next = False  # If later page fails, return what we have
+                            break
 
-                if response.status_code == 200:
-                    data = response.json()
-                    standings = data.get('standings', {})
-                    results = standings.get('results', [])
+                        results = standings.get('results', [])
+                        if not results:
+                            has_next = False
+                            break
 
-                    if results:
                         all_managers.extend(results)
                         print(
                             f"📄 Page {page}: {len(results)} managers (Total: {len(all_managers)})")
 
                         # Check if there's a next page
                         has_next = standings.get('has_next', False)
-                        page += 1
+                        if not has_next:
+                            break
 
-                        # Brief pause between pages to be respectful to the API
-                        time.sleep(0.5)
-                    else:
-                        has_next = False
-                else:
-                    print(
-                        f"❌ Error fetching league data page {page}: {response.status_code}")
-                    if page == 1:  # If first page fails, return None
-                        return None
-                    else:  # If later page fails, return what we have
-                        break
+                    page = pages.stop
+                    window = min(window * 2, LEAGUE_PAGE_WORKERS)
+
+                    # Brief pause between windows to be respectful to the API
+                    if has_next:
+                        time.sleep(LEAGUE_PAGE_DELAY)
 
             # Return data in the same format as single page
             return {
@@ -265,20 +707,25 @@ class FPLCombinationAnalyzer:
         try:
             if gameweek is None:
                 # Get current gameweek from bootstrap data
-                if self.bootstrap_data:
-                    events = self.bootstrap_data.get('events', [])
-                    current_gw = next(
-                        (gw['id'] for gw in events if gw['is_current']), 1)
-                else:
-                    current_gw = 1
+                current_gw = self.current_gameweek
             else:
                 current_gw = gameweek
 
             url = f"https://fantasy.premierleague.com/api/entry/{manager_id}/event/{current_gw}/picks/"
-            response = session.get(url, timeout=5)
+            # Stream so the body is only read once the headers look sane
+            response = session.get(url, timeout=5, stream=True)
             if response.status_code == 200:
-                return response.json()
+                content_type = response.headers.get('Content-Type', '')
+                content_length = response.headers.get('Content-Length')
+                if content_type.split(';')[0].strip() != 'application/json' or \
+                        (content_length and int(content_length) > MAX_SQUAD_PAYLOAD):
+                    response.close()
+                    print(
+                        f"❌ Unexpected response for manager {manager_id}: {content_type or 'no content type'}")
+                    return None
+                return self._slim_squad(_json_loads(response.content))
             else:
+                response.close()
                 print(
                     f"❌ Error fetching squad for manager {manager_id}: {response.status_code}")
                 return None
@@ -286,19 +733,64 @@ class FPLCombinationAnalyzer:
             print(f"❌ Exception fetching squad for manager {manager_id}: {e}")
             return None
 
+    @staticmethod
+    def _slim_squad(squad: Dict) -> Dict:
+        """Keep only the fields the analysis reads from a picks payload."""
+        entry_history = squad.get('entry_history') or {}
+        return {
+            'picks': [{'element': pick['element']} for pick in squad['picks']],
+            'entry_history': {'points': entry_history.get('points', 0)}
+        }
+
     def initialize_data(self):
         """Initialize bootstrap data and player information."""
         print("🔄 Fetching FPL bootstrap data...")
         try:
-            self.bootstrap_data = self.get_bootstrap_data()
+            bootstrap_data = self.get_bootstrap_data()
+            unchanged = bootstrap_data is self.bootstrap_data and self.players_df is not None
+            self.bootstrap_data = bootstrap_data
+            self.__dict__.pop('current_gameweek', None)
             if not self.bootstrap_data:
                 raise Exception("Failed to fetch bootstrap data")
 
-            # Create players DataFrame
+            if unchanged:
+                print(
+                    f"✅ Player data unchanged ({len(self.players_df)} players)")
+                return True
+
+            # Create players DataFrame with only the columns we use, and
+            # shrink the integer columns to the smallest dtype that fits
             players = self.bootstrap_data['elements']
-            self.players_df = pd.DataFrame(players)
-            self.players_df['full_name'] = self.players_df['first_name'] + \
-                ' ' + self.players_df['second_name']
+            players_df = pd.DataFrame(players, columns=PLAYER_COLUMNS)
+            for column in players_df.select_dtypes('integer').columns:
+                players_df[column] = pd.to_numeric(
+                    players_df[column], downcast='unsigned')
+            players_df['full_name'] = players_df['first_name'] + \
+                ' ' + players_df['second_name']
+            # Lowercased copies of the name columns, so case-insensitive
+            # searches don't lowercase the whole column on every query
+            for column in ('web_name', 'full_name', 'first_name', 'second_name'):
+                players_df[f'_{column}_lc'] = players_df[column].str.lower().fillna('')
+            self.players_df = players_df
+
+            # Exact-name indexes (full names win over web names, first row
+            # wins on duplicates) plus an array for substring fallback
+            self._name_lc = players_df['_full_name_lc'].to_numpy(dtype=str)
+            self.web_name_index = {}
+            for row, name in enumerate(players_df['_web_name_lc']):
+                self.web_name_index.setdefault(name, row)
+            self._name_index = {}
+            for row, name in enumerate(players_df['_full_name_lc']):
+                self._name_index.setdefault(name, row)
+            for name, row in self.web_name_index.items():
+                self._name_index.setdefault(name, row)
+
+            # Team and position names by ID, for labelling players
+            self.team_name_by_id = {
+                team['id']: team['name'] for team in self.bootstrap_data.get('teams', [])}
+            self.position_name_by_id = {
+                position['id']: position['singular_name']
+                for position in self.bootstrap_data.get('element_types', [])}
 
             print(f"✅ Loaded {len(self.players_df)} players")
             return True
@@ -313,10 +805,17 @@ class FPLCombinationAnalyzer:
             print("❌ Player data not initialized")
             return pd.DataFrame()
 
-        mask = self.players_df['full_name'].str.contains(
-            search_term, case=False, na=False)
-        results = self.players_df[mask][[
-            'full_name', 'web_name', 'team', 'element_type']].head(limit)
+        term = search_term.lower()
+        exact_row = self._name_index.get(term)
+        if exact_row is not None and limit == 1:
+            rows = [exact_row]
+        else:
+            rows = np.flatnonzero(np.char.find(self._name_lc, term) >= 0)
+            if exact_row is not None:
+                rows = [exact_row] + [row for row in rows if row != exact_row]
+
+        results = self.players_df.iloc[list(rows[:limit])][[
+            'id', 'full_name', 'web_name', 'team', 'element_type']]
         return results
 
     def get_league_info(self, league_id: int) -> bool:
@@ -352,8 +851,16 @@ class FPLCombinationAnalyzer:
         return None
 
     def fetch_manager_squads_batch(self, manager_ids: List[int], batch_size: int = 200,
-                                   max_workers: int = 5, speed_mode: str = 'conservative') -> Dict[int, Dict]:
-        """Fetch manager squads in batches with different speed settings."""
+                                   max_workers: int = 5, speed_mode: str = 'conservative',
+                                   league_id: int = None, gameweek: int = None) -> Dict[int, Dict]:
+        """Fetch manager squads in batches with different speed settings.
+
+        Each fetched squad is appended to a checkpoint file for the league
+        (the current league unless league_id is given), so an interrupted
+        run resumes without re-fetching. save_manager_squads_cache removes
+        the checkpoint once the squads are cached. A fetch that finds the
+        checkpoint in use by another fetch of the league runs without one.
+        """
         print(
             f"🔄 Fetching squads for {len(manager_ids)} managers in {speed_mode} mode...")
 
@@ -379,19 +886,39 @@ class FPLCombinationAnalyzer:
         print(
             f"⚙️  Settings: {batch_size} managers/batch, {max_workers} workers, {batch_delay}s delay")
 
+        if league_id is None:
+            league_id = self.current_league_id
+        checkpoint = None
+        resumed_squads = {}
+        if league_id is not None:
+            checkpoint = self._open_checkpoint(
+                self.get_checkpoint_filename(league_id, gameweek))
+            if checkpoint is None:
+                print("⚠️  League is already being fetched elsewhere - continuing without a checkpoint")
+            else:
+                resumed_squads = self._read_checkpoint(
+                    checkpoint, set(manager_ids))
+            if resumed_squads:
+                print(
+                    f"♻️  Resuming from checkpoint: {len(resumed_squads)} squads already fetched")
+        pending_ids = [
+            manager_id for manager_id in manager_ids if manager_id not in resumed_squads]
+
         all_squads = {}
-        total_batches = (len(manager_ids) + batch_size - 1) // batch_size
+        total_batches = (len(pending_ids) + batch_size - 1) // batch_size
         start_time = time.time()
 
-        for batch_num, i in enumerate(range(0, len(manager_ids), batch_size)):
-            batch_ids = manager_ids[i:i + batch_size]
-            batch_start = time.time()
+        # One pool serves every batch so worker threads and their
+        # connections are reused for the whole run
+        with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+                (checkpoint or contextlib.nullcontext()):
+            for batch_num, i in enumerate(range(0, len(pending_ids), batch_size)):
+                batch_ids = pending_ids[i:i + batch_size]
+                batch_start = time.time()
 
-            print(
-                f"📦 Batch {batch_num + 1}/{total_batches} ({len(batch_ids)} managers)")
+                print(
+                    f"📦 Batch {batch_num + 1}/{total_batches} ({len(batch_ids)} managers)")
 
-            # Process batch with threading
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
                 future_to_id = {
                     executor.submit(self.get_manager_squad_safe, manager_id, retry_delay): manager_id
                     for manager_id in batch_ids
@@ -403,29 +930,37 @@ class FPLCombinationAnalyzer:
                         squad = future.result()
                         if squad:
                             all_squads[manager_id] = squad
+                            if checkpoint:
+                                checkpoint.write(
+                                    self._pack_checkpoint_record(manager_id, squad))
                     except Exception as e:
                         print(f"❌ Error processing manager {manager_id}: {e}")
 
-            # Performance metrics
-            batch_time = time.time() - batch_start
-            total_time = time.time() - start_time
-            success_rate = len(all_squads) / ((batch_num + 1) * batch_size) * \
-                100 if batch_num == 0 else len(
-                    all_squads) / len(manager_ids[:i + len(batch_ids)]) * 100
-            avg_time_per_manager = total_time / \
-                len(all_squads) if all_squads else 0
+                # Performance metrics
+                batch_time = time.time() - batch_start
+                total_time = time.time() - start_time
+                success_rate = len(all_squads) / ((batch_num + 1) * batch_size) * \
+                    100 if batch_num == 0 else len(
+                        all_squads) / len(pending_ids[:i + len(batch_ids)]) * 100
+                avg_time_per_manager = total_time / \
+                    len(all_squads) if all_squads else 0
 
-            print(
-                f"✅ Batch {batch_num + 1} complete in {batch_time:.1f}s | Total: {len(all_squads)} | Success: {success_rate:.1f}%")
-            print(
-                f"⏱️  Avg: {avg_time_per_manager:.2f}s/manager | ETA: {(len(manager_ids) - len(all_squads)) * avg_time_per_manager / 60:.1f} min")
+                print(
+                    f"✅ Batch {batch_num + 1} complete in {batch_time:.1f}s | Total: {len(all_squads)} | Success: {success_rate:.1f}%")
+                print(
+                    f"⏱️  Avg: {avg_time_per_manager:.2f}s/manager | ETA: {(len(pending_ids) - len(all_squads)) * avg_time_per_manager / 60:.1f} min")
 
-            # Memory cleanup and pause between batches
-            gc.collect()
-            if batch_num < total_batches - 1 and batch_delay > 0:
-                time.sleep(batch_delay)
+                # Make this batch durable before moving on
+                if checkpoint:
+                    checkpoint.flush()
+                    os.fsync(checkpoint.fileno())
+
+                # Pause between batches
+                if batch_num < total_batches - 1 and batch_delay > 0:
+                    time.sleep(batch_delay)
 
         total_time = time.time() - start_time
+        all_squads.update(resumed_squads)
         self.manager_squads = all_squads
         print(
             f"🎉 Completed in {total_time:.1f}s | {len(all_squads)}/{len(manager_ids)} squads ({len(all_squads)/len(manager_ids)*100:.1f}%)")
@@ -446,6 +981,67 @@ class FPLCombinationAnalyzer:
                 time.sleep(retry_delay)  # Configurable pause on error
         return None
 
+    def _build_squad_matrix(self):
+        """Pack manager squads into an (n_managers, 15) matrix of element IDs."""
+        manager_ids = []
+        rows = []
+        for manager_id, squad_data in self.manager_squads.items():
+            try:
+                elements = [pick['element']
+                            for pick in squad_data['picks']][:SQUAD_SIZE]
+            except (KeyError, TypeError):
+                continue
+            manager_ids.append(manager_id)
+            # Pad short squads with 0, which is never a valid element ID
+            rows.append(elements + [0] * (SQUAD_SIZE - len(elements)))
+
+        self._manager_ids_arr = np.array(manager_ids, dtype=np.int64)
+        self._squad_mat = np.array(
+            rows, dtype=np.uint16).reshape(-1, SQUAD_SIZE)
+        self._owner_rows = None
+        self._owner_offsets = None
+
+    def _get_squad_matrix(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (manager_ids, squad_matrix) for the current squads."""
+        return self._manager_ids_arr, self._squad_mat
+
+    def _get_owner_index(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (owner_rows, offsets), an inverted index from element ID to squad rows.
+
+        The matrix rows owning element ``pid`` are
+        ``owner_rows[offsets[pid]:offsets[pid + 1]]``, in ascending order.
+        """
+        _, squad_mat = self._get_squad_matrix()
+        if self._owner_offsets is None:
+            elements = squad_mat.ravel()
+            order = np.argsort(elements, kind='stable')
+            self._owner_rows = (order // SQUAD_SIZE).astype(np.int32)
+            counts = np.bincount(elements, minlength=1)
+            self._owner_offsets = np.concatenate(
+                ([0], np.cumsum(counts))).astype(np.int32)
+        return self._owner_rows, self._owner_offsets
+
+    def _owner_rows_for(self, player_id: int) -> np.ndarray:
+        """Return the sorted matrix rows of squads containing ``player_id``."""
+        owner_rows, offsets = self._get_owner_index()
+        if not 0 < player_id < len(offsets) - 1:
+            return owner_rows[:0]
+        return owner_rows[offsets[player_id]:offsets[player_id + 1]]
+
+    def find_managers_with_players(self, player_ids: List[int]) -> List[int]:
+        """Return the IDs of managers whose squads contain every given element ID."""
+        manager_ids_arr, _ = self._get_squad_matrix()
+        # Intersect owner lists starting from the rarest player, so the
+        # working set only ever shrinks
+        postings = sorted((self._owner_rows_for(pid)
+                           for pid in frozenset(player_ids)), key=len)
+        rows = postings[0] if postings else np.arange(len(manager_ids_arr))
+        for owners in postings[1:]:
+            if not rows.size:
+                break
+            rows = np.intersect1d(rows, owners, assume_unique=True)
+        return manager_ids_arr[rows].tolist()
+
     def find_player_combinations(self, player_names: List[str]) -> Tuple[List[int], Dict[str, any]]:
         """Find managers who have all specified players."""
         if not self.manager_squads:
@@ -460,26 +1056,14 @@ class FPLCombinationAnalyzer:
                 print(f"❌ Player '{name}' not found")
                 return [], {}
 
-            # Get the player ID (assuming exact match from search)
-            player_id = self.players_df[
-                self.players_df['full_name'].str.contains(
-                    name, case=False, na=False)
-            ].iloc[0]['id']
+            player_id = int(matches.iloc[0]['id'])
             player_ids.append(player_id)
             print(f"✅ Found {name} (ID: {player_id})")
 
         print(
             f"🔍 Searching for managers with all {len(player_ids)} players...")
 
-        matching_managers = []
-        for manager_id, squad_data in self.manager_squads.items():
-            try:
-                squad_player_ids = [pick['element']
-                                    for pick in squad_data['picks']]
-                if all(pid in squad_player_ids for pid in player_ids):
-                    matching_managers.append(manager_id)
-            except (KeyError, TypeError):
-                continue
+        matching_managers = self.find_managers_with_players(player_ids)
 
         # Prepare results
         results = {
@@ -512,10 +1096,11 @@ class FPLCombinationAnalyzer:
             print(f"\n📋 Manager IDs with this combination:")
             manager_ids = results['matching_managers']
 
-            # Print in rows of 10 for readability
-            for i in range(0, len(manager_ids), 10):
-                row = manager_ids[i:i+10]
-                print("   " + ", ".join(map(str, row)))
+            # Print in rows of 10 for readability, as one write
+            id_strings = list(map(str, manager_ids))
+            rows = [", ".join(id_strings[i:i+10])
+                    for i in range(0, len(id_strings), 10)]
+            sys.stdout.write("   " + "\n   ".join(rows) + "\n")
 
         print("="*60)
 
@@ -534,11 +1119,7 @@ class FPLCombinationAnalyzer:
                 league_id = int(input("\n📋 Enter FPL League ID: "))
 
                 # Get current gameweek for cache check
-                current_gw = None
-                if self.bootstrap_data:
-                    events = self.bootstrap_data.get('events', [])
-                    current_gw = next((gw['id']
-                                      for gw in events if gw['is_current']), 1)
+                current_gw = self.current_gameweek
 
                 print(
                     f"\n💾 Checking for cached data (League {league_id}, GW {current_gw})...")
@@ -691,7 +1272,7 @@ class FPLCombinationAnalyzer:
 
             # If we were extending cache, merge new data
             if cache_loaded and 'missing_manager_ids' in locals():
-                self.manager_squads.update(new_squads)
+                self.manager_squads = {**self.manager_squads, **new_squads}
                 print(
                     f"🔄 Extended cache: {len(self.manager_squads)} total managers")
 
@@ -6,75 +6,162 @@ A Flask web application for analyzing player combinations across FPL league mana
 Built on top of the existing FPL analysis tool with caching capabilities.
 """
 
-from player_combination_analysis import FPLCombinationAnalyzer
+from player_combination_analysis import FPLCombinationAnalyzer, CACHE_INDEX_FILE
 import sys
 import os
 import json
-from flask import Flask, render_template, request, jsonify, flash
+import time
+import hashlib
+import functools
+import threading
+from flask import Flask, render_template, request, jsonify, flash, make_response
+from flask.json.provider import DefaultJSONProvider
+from cachetools import LRUCache, TTLCache
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add parent directory to path to import the analysis module
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Serialize JSON with orjson, falling back to Flask's encoder hooks for
+    types orjson doesn't handle itself. Request parsing is unchanged."""
+
+    def dumps(self, obj, **kwargs):
+        # sort_keys and a 2-space indent have orjson equivalents; any other
+        # json.dumps option goes through the stdlib encoder instead
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if kwargs.get('sort_keys'):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent') == 2:
+            option |= orjson.OPT_INDENT_2
+        if set(kwargs) - {'sort_keys', 'indent'} or kwargs.get('indent') not in (None, 2):
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default,
+                         option=orjson.OPT_SERIALIZE_NUMPY),
+            mimetype=self.mimetype)
+
+
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 app.secret_key = os.getenv('FLASK_SECRET_KEY', 'dev-key-change-in-production')
 
-# Global analyzer instance
+# Global analyzer instance, holding the bootstrap and player data
 analyzer = FPLCombinationAnalyzer()
 
-# Cache for league standings to avoid repeated fetching
-league_standings_cache = {}
-cache_timestamps = {}
-
 # Cache settings
 CACHE_EXPIRY_MINUTES = 1440  # Clear cache after 1 day (24 hours * 60 minutes)
 MAX_CACHED_LEAGUES = 5       # Keep max 5 leagues in memory
+MAX_SEARCH_RESULTS = 20      # Player suggestions returned per search
+
+# Cache for league standings to avoid repeated fetching, each entry
+# indexed by manager ID (see index_standings). Expired and least recently
+# used entries are evicted as the cache is accessed.
+league_standings_cache = TTLCache(
+    maxsize=MAX_CACHED_LEAGUES, ttl=CACHE_EXPIRY_MINUTES * 60)
+
+# Per-league analyzers (squads, league data and search index) keyed by
+# (league_id, gameweek). Evicting a league frees all of its memory.
+league_analyzers = LRUCache(maxsize=MAX_CACHED_LEAGUES)
+active_league_key = None
+
+# The caches above and the active league live in this process, so the app
+# is served by a single (threaded) worker; each worker would otherwise
+# hold its own leagues and its own idea of the active one. cachetools
+# caches aren't thread-safe, reads included, so every access takes the lock.
+league_lock = threading.Lock()
+
+
+def prebuilt_error(message, status):
+    """Serialize a fixed error message once, for use with error_response."""
+    return json.dumps({'error': message}).encode(), status
+
+
+def error_response(error):
+    """Build a JSON error response from a prebuilt (body, status) pair."""
+    body, status = error
+    return app.response_class(body, status=status, mimetype='application/json')
+
+
+# Fixed validation errors, serialized at import time
+ERR_NO_LEAGUE_ID = prebuilt_error('League ID is required', 400)
+ERR_BAD_LEAGUE_ID = prebuilt_error('League ID must be a number', 400)
+ERR_INIT_FPL_DATA = prebuilt_error('Failed to initialize FPL data', 500)
+ERR_LEAGUE_LOAD = prebuilt_error('Failed to load league data. Please check the league ID.', 400)
+ERR_INIT_PLAYER_DATA = prebuilt_error('Failed to initialize player data', 500)
+ERR_NO_PLAYERS = prebuilt_error('At least one player name is required', 400)
+ERR_NO_LEAGUE_LOADED = prebuilt_error('No league data loaded. Please load a league first.', 400)
+
+
+def revalidate(view):
+    """Let clients keep a view's successful responses but revalidate them
+    against the ETag on every use, since they reflect server state that a
+    league load or cache change can alter at any time."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        response = make_response(view(*args, **kwargs))
+        if response.status_code in (200, 304):
+            response.cache_control.no_cache = True
+        return response
+    return wrapper
+
+
+def activate_league(league_key, league_analyzer):
+    """Keep a loaded league's analyzer and make it the one requests use by default.
+
+    A newly stored analyzer is stamped with its load time, which versions the
+    responses built from its data.
+    """
+    global active_league_key
+    with league_lock:
+        if league_analyzers.get(league_key) is not league_analyzer:
+            league_analyzer.loaded_at = time.time_ns()
+        league_analyzers[league_key] = league_analyzer
+        active_league_key = league_key
+
+
+def get_league_analyzer(league_id=None):
+    """Return the analyzer holding the integer ``league_id`` (default: the
+    last league loaded) for the current gameweek, or None if it isn't loaded."""
+    with league_lock:
+        if league_id is None:
+            league_key = active_league_key
+        else:
+            league_key = (league_id, analyzer.current_gameweek)
+        return league_analyzers.get(league_key)
 
 
-def cleanup_expired_cache():
-    """Remove expired cache entries and limit cache size."""
-    current_time = datetime.now()
-    expired_keys = []
-
-    # Find expired entries
-    for cache_key, timestamp in cache_timestamps.items():
-        if (current_time - timestamp).total_seconds() > CACHE_EXPIRY_MINUTES * 60:
-            expired_keys.append(cache_key)
-
-    # Remove expired entries
-    for key in expired_keys:
-        league_standings_cache.pop(key, None)
-        cache_timestamps.pop(key, None)
-
-    # If still too many entries, remove oldest ones
-    if len(league_standings_cache) > MAX_CACHED_LEAGUES:
-        # Sort by timestamp and keep only the newest entries
-        sorted_items = sorted(cache_timestamps.items(),
-                              key=lambda x: x[1], reverse=True)
-        keys_to_keep = [item[0] for item in sorted_items[:MAX_CACHED_LEAGUES]]
-
-        # Remove excess entries
-        keys_to_remove = set(league_standings_cache.keys()) - set(keys_to_keep)
-        for key in keys_to_remove:
-            league_standings_cache.pop(key, None)
-            cache_timestamps.pop(key, None)
+def index_standings(league_standings):
+    """Index league standings rows by manager (entry) ID."""
+    return {manager['entry']: manager for manager in league_standings}
 
-    if expired_keys:
-        print(f"🧹 Cleaned up {len(expired_keys)} expired cache entries")
 
+def make_etag(*parts):
+    """Build an ETag from the values a response is derived from."""
+    return hashlib.blake2b(':'.join(map(str, parts)).encode(), digest_size=16).hexdigest()
 
-def is_cache_valid(cache_key):
-    """Check if a cache entry is still valid (not expired)."""
-    if cache_key not in cache_timestamps:
-        return False
 
-    current_time = datetime.now()
-    cache_time = cache_timestamps[cache_key]
-    is_valid = (current_time -
-                cache_time).total_seconds() <= CACHE_EXPIRY_MINUTES * 60
+def not_modified(etag):
+    """Return a 304 response if the client already holds ``etag``, else None.
 
-    return is_valid
+    Checked before the body is built, so a revalidation skips that work.
+    """
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+    return None
 
 # Global analyzer instance
 
@@ -114,43 +201,45 @@ def load_league():
         league_id = data.get('league_id')
 
         if not league_id:
-            return jsonify({'error': 'League ID is required'}), 400
+            return error_response(ERR_NO_LEAGUE_ID)
 
         try:
             league_id = int(league_id)
-        except ValueError:
-            return jsonify({'error': 'League ID must be a number'}), 400
+        except (ValueError, TypeError):
+            return error_response(ERR_BAD_LEAGUE_ID)
+
+        # Initialize bootstrap data if not already done
+        if not analyzer.bootstrap_data:
+            success = analyzer.initialize_data()
+            if not success:
+                return error_response(ERR_INIT_FPL_DATA)
+
+        # Get current gameweek for cache check
+        current_gw = analyzer.current_gameweek
+        league_key = (league_id, current_gw)
 
         # Check if data is already loaded for this league
-        if analyzer.current_league_id == league_id and analyzer.manager_squads:
+        league_analyzer = get_league_analyzer(league_id)
+        if league_analyzer is not None and league_analyzer.manager_squads:
+            activate_league(league_key, league_analyzer)
             return jsonify({
                 'success': True,
                 'message': f'League {league_id} data already loaded',
-                'manager_count': len(analyzer.manager_squads),
+                'manager_count': len(league_analyzer.manager_squads),
                 'from_cache': True
             })
 
-        # Initialize bootstrap data if not already done
-        if not analyzer.bootstrap_data:
-            success = analyzer.initialize_data()
-            if not success:
-                return jsonify({'error': 'Failed to initialize FPL data'}), 500
-
-        # Get current gameweek for cache check
-        current_gw = None
-        if analyzer.bootstrap_data:
-            events = analyzer.bootstrap_data.get('events', [])
-            current_gw = next((gw['id']
-                              for gw in events if gw['is_current']), 1)
+        # Each league gets its own analyzer, sharing the player data
+        league_analyzer = analyzer.for_new_league()
 
         # Check if cache exists before attempting to load
-        cache_available = analyzer.cache_exists(league_id, current_gw)
+        cache_available = league_analyzer.cache_exists(league_id, current_gw)
 
         if cache_available:
             print(
                 f"🚀 Cache found for league {league_id}, gameweek {current_gw} - loading immediately...")
             # Try to load cache first (skip_prompt=True for web app)
-            cache_loaded = analyzer.load_manager_squads_cache(
+            cache_loaded = league_analyzer.load_manager_squads_cache(
                 league_id, current_gw, skip_prompt=True)
         else:
             print(
@@ -159,71 +248,76 @@ def load_league():
 
         if cache_loaded:
             # Set the current league ID so the analyzer knows which league is loaded
-            analyzer.current_league_id = league_id
+            league_analyzer.current_league_id = league_id
+            activate_league(league_key, league_analyzer)
 
             # Check if we have league data from cache (new format) or need to fetch it (old format)
             cache_key = f"{league_id}_{current_gw}"
-            if analyzer.league_data and 'standings' in analyzer.league_data:
+            if league_analyzer.league_data and 'standings' in league_analyzer.league_data:
                 # New cache format - league data is available
-                league_standings = analyzer.league_data.get(
+                league_standings = league_analyzer.league_data.get(
                     'standings', {}).get('results', [])
-                league_standings_cache[cache_key] = league_standings
-                cache_timestamps[cache_key] = datetime.now()
+                standings_by_entry = index_standings(league_standings)
+                with league_lock:
+                    league_standings_cache[cache_key] = standings_by_entry
                 print(f"⚡ League data loaded from cache for {cache_key}")
             else:
                 # Old cache format or missing league data - fetch it once and cache it
                 print(
                     f"📊 Fetching league standings for cached league {league_id} (one-time upgrade)...")
-                if analyzer.get_league_info(league_id):
+                if league_analyzer.get_league_info(league_id):
                     # Cache the league standings in memory
-                    if analyzer.league_data and 'standings' in analyzer.league_data:
-                        league_standings = analyzer.league_data.get(
+                    if league_analyzer.league_data and 'standings' in league_analyzer.league_data:
+                        league_standings = league_analyzer.league_data.get(
                             'standings', {}).get('results', [])
-                        league_standings_cache[cache_key] = league_standings
-                        cache_timestamps[cache_key] = datetime.now()
+                        standings_by_entry = index_standings(league_standings)
+                        with league_lock:
+                            league_standings_cache[cache_key] = standings_by_entry
                         print(f"💾 Cached league standings for {cache_key}")
 
                         # Update the cache file with the new format for next time
-                        analyzer.save_manager_squads_cache(
+                        league_analyzer.save_manager_squads_cache(
                             league_id, current_gw)
                         print(f"🔄 Updated cache to new format with league data")
 
             return jsonify({
                 'success': True,
                 'message': f'Successfully loaded league {league_id} from cache (fast)',
-                'manager_count': len(analyzer.manager_squads),
+                'manager_count': len(league_analyzer.manager_squads),
                 'from_cache': True
             })
 
         # No cache found, fetch fresh data
-        if not analyzer.get_league_info(league_id):
-            return jsonify({'error': 'Failed to load league data. Please check the league ID.'}), 400
+        if not league_analyzer.get_league_info(league_id):
+            return error_response(ERR_LEAGUE_LOAD)
 
         # Cache the league standings in memory immediately after fetching
         cache_key = f"{league_id}_{current_gw}"
-        if analyzer.league_data and 'standings' in analyzer.league_data:
-            league_standings = analyzer.league_data.get(
+        if league_analyzer.league_data and 'standings' in league_analyzer.league_data:
+            league_standings = league_analyzer.league_data.get(
                 'standings', {}).get('results', [])
-            league_standings_cache[cache_key] = league_standings
-            cache_timestamps[cache_key] = datetime.now()
+            standings_by_entry = index_standings(league_standings)
+            with league_lock:
+                league_standings_cache[cache_key] = standings_by_entry
             print(f"💾 Cached league standings during load for {cache_key}")
 
         # Get manager IDs and fetch squads
         manager_ids = [entry['entry']
-                       for entry in analyzer.league_data['standings']['results']]
+                       for entry in league_analyzer.league_data['standings']['results']]
 
         try:
             # Fetch manager squads using aggressive mode for faster processing
-            analyzer.fetch_manager_squads_batch(
+            league_analyzer.fetch_manager_squads_batch(
                 manager_ids, speed_mode='aggressive')
 
             # Save to cache for future use
-            analyzer.save_manager_squads_cache(league_id, current_gw)
+            league_analyzer.save_manager_squads_cache(league_id, current_gw)
+            activate_league(league_key, league_analyzer)
 
             return jsonify({
                 'success': True,
                 'message': f'Successfully loaded league {league_id}',
-                'manager_count': len(analyzer.manager_squads),
+                'manager_count': len(league_analyzer.manager_squads),
                 'from_cache': False
             })
 
@@ -247,81 +341,53 @@ def search_players():
         # Make sure bootstrap data is loaded
         if analyzer.players_df is None:
             if not analyzer.initialize_data():
-                return jsonify({'error': 'Failed to initialize player data'}), 500
+                return error_response(ERR_INIT_PLAYER_DATA)
 
         query_lower = query.lower()
-
-        # Multiple search strategies
-        matches = []
-
-        # 1. Exact web_name match (highest priority)
-        exact_web = analyzer.players_df[analyzer.players_df['web_name'].str.lower(
-        ) == query_lower]
-        matches.extend(exact_web.to_dict('records'))
-
-        # 2. Web_name starts with query
-        starts_web = analyzer.players_df[analyzer.players_df['web_name'].str.lower(
-        ).str.startswith(query_lower)]
-        matches.extend(starts_web.to_dict('records'))
-
-        # 3. Web_name contains query
-        contains_web = analyzer.players_df[analyzer.players_df['web_name'].str.lower(
-        ).str.contains(query_lower, na=False)]
-        matches.extend(contains_web.to_dict('records'))
-
-        # 4. Full name contains query
-        contains_full = analyzer.players_df[analyzer.players_df['full_name'].str.lower(
-        ).str.contains(query_lower, na=False)]
-        matches.extend(contains_full.to_dict('records'))
-
-        # 5. First or last name contains query
-        contains_first = analyzer.players_df[analyzer.players_df['first_name'].str.lower(
-        ).str.contains(query_lower, na=False)]
-        matches.extend(contains_first.to_dict('records'))
-
-        contains_second = analyzer.players_df[analyzer.players_df['second_name'].str.lower(
-        ).str.contains(query_lower, na=False)]
-        matches.extend(contains_second.to_dict('records'))
-
-        # Remove duplicates while preserving order
-        seen_ids = set()
-        unique_matches = []
-        for match in matches:
-            if match['id'] not in seen_ids:
-                seen_ids.add(match['id'])
-                unique_matches.append(match)
-
-        # Limit results
-        unique_matches = unique_matches[:20]
+        players_df = analyzer.players_df
+
+        # Multiple search strategies, in priority order. Each one only runs
+        # if the earlier ones haven't already filled the result list.
+        search_stages = [
+            # 1. Exact web_name match (highest priority)
+            lambda: players_df['_web_name_lc'] == query_lower,
+            # 2. Web_name starts with query
+            lambda: players_df['_web_name_lc'].str.startswith(query_lower),
+            # 3. Web_name contains query
+            lambda: players_df['_web_name_lc'].str.contains(
+                query_lower, na=False, regex=False),
+            # 4. Full name contains query
+            lambda: players_df['_full_name_lc'].str.contains(
+                query_lower, na=False, regex=False),
+            # 5. First or last name contains query
+            lambda: players_df['_first_name_lc'].str.contains(
+                query_lower, na=False, regex=False),
+            lambda: players_df['_second_name_lc'].str.contains(
+                query_lower, na=False, regex=False),
+        ]
+
+        # Collect matching row positions, deduplicated in first-seen order,
+        # and stop as soon as there are enough; only those rows are
+        # converted to records
+        match_rows = {}
+        for stage in search_stages:
+            for row in stage().to_numpy().nonzero()[0]:
+                match_rows.setdefault(int(row))
+                if len(match_rows) >= MAX_SEARCH_RESULTS:
+                    break
+            if len(match_rows) >= MAX_SEARCH_RESULTS:
+                break
+
+        unique_matches = players_df.iloc[list(match_rows)].to_dict('records')
 
         players = []
         for player in unique_matches:
-            # Get team and position names from bootstrap data
-            team_name = "Unknown"
-            position_name = "Unknown"
-
-            if analyzer.bootstrap_data:
-                # Get team name
-                teams = analyzer.bootstrap_data.get('teams', [])
-                team_data = next(
-                    (t for t in teams if t['id'] == player['team']), None)
-                if team_data:
-                    team_name = team_data['name']
-
-                # Get position name
-                element_types = analyzer.bootstrap_data.get(
-                    'element_types', [])
-                pos_data = next(
-                    (p for p in element_types if p['id'] == player['element_type']), None)
-                if pos_data:
-                    position_name = pos_data['singular_name']
-
             players.append({
                 'id': int(player['id']),
                 'name': str(player['web_name']),
                 'full_name': str(player['full_name']),
-                'team': team_name,
-                'position': position_name
+                'team': analyzer.team_name_by_id.get(player['team'], 'Unknown'),
+                'position': analyzer.position_name_by_id.get(player['element_type'], 'Unknown')
             })
 
         return jsonify({'players': players})
@@ -336,35 +402,19 @@ def find_player_by_name(name):
         return None
 
     name_lower = name.lower().strip()
+    players_df = analyzer.players_df
 
     # Try exact web_name match first
-    exact_match = analyzer.players_df[analyzer.players_df['web_name'].str.lower(
-    ) == name_lower]
-    if not exact_match.empty:
-        return exact_match.iloc[0]
-
-    # Try web_name contains
-    web_name_match = analyzer.players_df[analyzer.players_df['web_name'].str.lower(
-    ).str.contains(name_lower, na=False)]
-    if not web_name_match.empty:
-        return web_name_match.iloc[0]
-
-    # Try full_name contains
-    full_name_match = analyzer.players_df[analyzer.players_df['full_name'].str.lower(
-    ).str.contains(name_lower, na=False)]
-    if not full_name_match.empty:
-        return full_name_match.iloc[0]
-
-    # Try first_name or second_name contains
-    first_name_match = analyzer.players_df[analyzer.players_df['first_name'].str.lower(
-    ).str.contains(name_lower, na=False)]
-    if not first_name_match.empty:
-        return first_name_match.iloc[0]
-
-    second_name_match = analyzer.players_df[analyzer.players_df['second_name'].str.lower(
-    ).str.contains(name_lower, na=False)]
-    if not second_name_match.empty:
-        return second_name_match.iloc[0]
+    exact_row = analyzer.web_name_index.get(name_lower)
+    if exact_row is not None:
+        return players_df.iloc[exact_row]
+
+    # Then web_name, full_name, first_name and second_name contains, in
+    # that order; the first column with a hit decides, first row wins
+    for column in ('_web_name_lc', '_full_name_lc', '_first_name_lc', '_second_name_lc'):
+        mask = players_df[column].str.contains(name_lower, na=False, regex=False)
+        if mask.any():
+            return players_df.loc[mask.idxmax()]
 
     return None
 
@@ -377,15 +427,23 @@ def analyze_combination():
         player_names = data.get('player_names', [])
 
         if not player_names:
-            return jsonify({'error': 'At least one player name is required'}), 400
+            return error_response(ERR_NO_PLAYERS)
 
-        if not analyzer.manager_squads:
-            return jsonify({'error': 'No league data loaded. Please load a league first.'}), 400
+        league_id = data.get('league_id')
+        if league_id is not None:
+            try:
+                league_id = int(league_id)
+            except (ValueError, TypeError):
+                return error_response(ERR_BAD_LEAGUE_ID)
+
+        league_analyzer = get_league_analyzer(league_id)
+        if league_analyzer is None or not league_analyzer.manager_squads:
+            return error_response(ERR_NO_LEAGUE_LOADED)
 
         # Make sure bootstrap data is loaded
         if analyzer.players_df is None:
             if not analyzer.initialize_data():
-                return jsonify({'error': 'Failed to initialize player data'}), 500
+                return error_response(ERR_INIT_PLAYER_DATA)
 
         # Find player IDs using our improved search
         player_ids = []
@@ -399,74 +457,46 @@ def analyze_combination():
             player_ids.append(int(player['id']))
             found_players.append(player['web_name'])
 
-        # Find managers with all these players
-        matching_managers = []
-        for manager_id, squad_data in analyzer.manager_squads.items():
-            try:
-                squad_player_ids = [pick['element']
-                                    for pick in squad_data['picks']]
-                if all(pid in squad_player_ids for pid in player_ids):
-                    matching_managers.append(manager_id)
-            except (KeyError, TypeError):
-                continue
-
         # Get current gameweek for the FPL link
-        current_gw = 1  # Default fallback
-        if analyzer.bootstrap_data:
-            events = analyzer.bootstrap_data.get('events', [])
-            current_gw = next((gw['id']
-                              for gw in events if gw['is_current']), 1)
+        current_gw = analyzer.current_gameweek
+
+        # Find managers with all these players via the analyzer's owner index
+        matching_managers = league_analyzer.find_managers_with_players(player_ids)
 
         # Get detailed manager information from league data
         formatted_results = []
 
         # Check if we have league standings cached in memory for this league
-        cache_key = f"{analyzer.current_league_id}_{current_gw}"
+        cache_key = f"{league_analyzer.current_league_id}_{current_gw}"
 
-        print(f"🔍 Debug: Looking for cache key: {cache_key}")
-        print(
-            f"🔍 Debug: Available cache keys: {list(league_standings_cache.keys())}")
-        print(f"🔍 Debug: Cache exists: {cache_key in league_standings_cache}")
-        print(f"🔍 Debug: Cache valid: {is_cache_valid(cache_key)}")
-
-        if cache_key in league_standings_cache and is_cache_valid(cache_key):
-            print(f"⚡ Using cached league standings for {cache_key}")
+        try:
             # Use cached league standings - no need to fetch
-            league_standings = league_standings_cache[cache_key]
-        else:
-            # Cache miss or expired - need to fetch league standings
-            if cache_key in league_standings_cache:
-                print(f"🔄 Cache expired! Fetching fresh league standings...")
-            else:
-                print(f"🔄 Cache miss! Fetching league standings for manager details...")
-
-            analyzer.get_league_info(analyzer.current_league_id)
-
-            # Cache the league standings in memory with timestamp
-            if analyzer.league_data:
-                league_standings = analyzer.league_data.get(
-                    'standings', {}).get('results', [])
-                league_standings_cache[cache_key] = league_standings
-                cache_timestamps[cache_key] = datetime.now()
+            with league_lock:
+                standings_by_entry = league_standings_cache[cache_key]
+        except KeyError:
+            # Cache miss or expired - rebuild from the league data stored on
+            # the analyzer when the league was loaded, without refetching
+            print(f"🔄 Cache miss! Using league standings from loaded league data...")
+            if league_analyzer.league_data:
+                standings_by_entry = index_standings(league_analyzer.league_data.get(
+                    'standings', {}).get('results', []))
+                with league_lock:
+                    league_standings_cache[cache_key] = standings_by_entry
                 print(f"💾 Cached league standings for {cache_key}")
             else:
-                league_standings = []
-
-        # Clean up expired cache entries AFTER using the cache
-        cleanup_expired_cache()
+                standings_by_entry = {}
 
-        if league_standings and matching_managers:
+        if standings_by_entry and matching_managers:
 
             # Limit to first 50 for performance
             for manager_id in matching_managers[:50]:
                 # Find manager in league standings
-                manager_info = next(
-                    (m for m in league_standings if m['entry'] == manager_id), None)
+                manager_info = standings_by_entry.get(manager_id)
 
                 # Get gameweek points from the manager's squad data
                 gw_points = 0
-                if manager_id in analyzer.manager_squads:
-                    squad_data = analyzer.manager_squads[manager_id]
+                if manager_id in league_analyzer.manager_squads:
+                    squad_data = league_analyzer.manager_squads[manager_id]
                     # Try to get points from different possible locations in the data
                     if 'entry_history' in squad_data and squad_data['entry_history']:
                         gw_points = squad_data['entry_history'].get(
@@ -506,8 +536,8 @@ def analyze_combination():
             for manager_id in matching_managers[:50]:
                 # Get gameweek points from the manager's squad data
                 gw_points = 0
-                if manager_id in analyzer.manager_squads:
-                    squad_data = analyzer.manager_squads[manager_id]
+                if manager_id in league_analyzer.manager_squads:
+                    squad_data = league_analyzer.manager_squads[manager_id]
                     if 'entry_history' in squad_data and squad_data['entry_history']:
                         gw_points = squad_data['entry_history'].get(
                             'points', 0)
@@ -527,9 +557,9 @@ def analyze_combination():
 
         return jsonify({
             'success': True,
-            'total_managers': len(analyzer.manager_squads),
+            'total_managers': len(league_analyzer.manager_squads),
             'matching_managers': len(matching_managers),
-            'percentage': (len(matching_managers) / len(analyzer.manager_squads)) * 100 if analyzer.manager_squads else 0,
+            'percentage': (len(matching_managers) / len(league_analyzer.manager_squads)) * 100 if league_analyzer.manager_squads else 0,
             'results': formatted_results,
             'current_gameweek': current_gw
         })
@@ -539,27 +569,55 @@ def analyze_combination():
 
 
 @app.route('/api/league_info')
+@revalidate
 def league_info():
     """Get current league information."""
     try:
-        if not analyzer.current_league_id:
+        league_analyzer = get_league_analyzer()
+        if league_analyzer is None:
             return jsonify({'loaded': False})
 
-        return jsonify({
+        manager_count = len(
+            league_analyzer.manager_squads) if league_analyzer.manager_squads else 0
+        league_name = league_analyzer.league_data.get(
+            'name', 'Unknown') if league_analyzer.league_data else 'Unknown'
+        etag = make_etag(league_analyzer.current_league_id,
+                         league_analyzer.loaded_at, manager_count, league_name)
+        cached_response = not_modified(etag)
+        if cached_response is not None:
+            return cached_response
+
+        response = jsonify({
             'loaded': True,
-            'league_id': analyzer.current_league_id,
-            'manager_count': len(analyzer.manager_squads) if analyzer.manager_squads else 0,
-            'league_name': analyzer.league_data.get('name', 'Unknown') if analyzer.league_data else 'Unknown'
+            'league_id': league_analyzer.current_league_id,
+            'manager_count': manager_count,
+            'league_name': league_name
         })
+        response.set_etag(etag)
+        return response
 
     except Exception as e:
         return jsonify({'error': f'An error occurred: {str(e)}'}), 500
 
 
 @app.route('/api/cache_info')
+@revalidate
 def cache_info():
     """Get cache information."""
     try:
+        # Saving or deleting a cache rewrites the index or changes the
+        # directory listing, so their mtimes identify the cache state
+        mtimes = []
+        for path in (analyzer.cache_dir, os.path.join(analyzer.cache_dir, CACHE_INDEX_FILE)):
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                mtimes.append(0)
+        etag = make_etag(*mtimes)
+        cached_response = not_modified(etag)
+        if cached_response is not None:
+            return cached_response
+
         cache_files = analyzer.list_available_caches()
 
         cache_info = []
@@ -572,7 +630,9 @@ def cache_info():
                 'total_managers': cache_file['total_managers_in_league']
             })
 
-        return jsonify({'cache_files': cache_info})
+        response = jsonify({'cache_files': cache_info})
+        response.set_etag(etag)
+        return response
 
     except Exception as e:
         return jsonify({'error': f'An error occurred: {str(e)}'}), 500
@@ -6,8 +6,6 @@ Quick test to see what data is in the cached manager squads
 from player_combination_analysis import FPLCombinationAnalyzer
 import sys
 import os
-import pickle
-import json
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))